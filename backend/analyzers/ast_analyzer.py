@@ -1,15 +1,34 @@
 import ast
+import builtins
+import hashlib
+import os
 import sys
-from typing import List, Dict, Any, Set
-from dataclasses import dataclass, asdict
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple, cast
+from dataclasses import dataclass
 from enum import Enum
 
+# Built-in names never flagged as unused; computed once at import instead
+# of allocating ~150 strings per analysis
+_BUILTINS: frozenset = frozenset(dir(builtins))
+
+# Interned category names: equality and hashing on these is a pointer
+# compare wherever issues are bucketed or deduplicated downstream
+_CAT_SYNTAX = sys.intern("syntax")
+_CAT_PARSING = sys.intern("parsing")
+_CAT_LOGIC = sys.intern("logic")
+_CAT_STYLE = sys.intern("style")
+_CAT_BEST_PRACTICE = sys.intern("best_practice")
+_CAT_UNUSED = sys.intern("unused")
+
 class IssueSeverity(Enum):
     ERROR = "error"
     WARNING = "warning"
     INFO = "info"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CodeIssue:
     line: int
     column: int
@@ -17,38 +36,132 @@ class CodeIssue:
     category: str
     message: str
     suggestion: str = ""
-    
-    def to_dict(self) -> Dict[str, Any]:
-        result = asdict(self)
-        result['severity'] = self.severity.value
-        return result
 
-class ASTAnalyzer(ast.NodeVisitor):
+    def to_dict(self, source: Optional[str] = None) -> Dict[str, Any]:
+        # Hand-rolled dict literal: dataclasses.asdict deep-copies every
+        # field, which dominates conversion cost on large result sets.
+        # The optional source tag is set at construction so callers do
+        # not need a second pass over the dicts to add it.
+        issue = {
+            'line': self.line,
+            'column': self.column,
+            'severity': self.severity.value,
+            'category': self.category,
+            'message': self.message,
+            'suggestion': self.suggestion,
+        }
+        if source is not None:
+            issue['source'] = source
+        return issue
+
+# Content-addressed memo of analysis results. The same file is analyzed
+# repeatedly across review sessions, so hits skip the parse and walk
+# entirely. Bounded LRU: oldest entry is evicted once the cap is hit.
+# Analyses run on pool threads, so the get/move_to_end and the
+# insert/popitem sequences must be atomic under the lock.
+_ANALYSIS_CACHE: "OrderedDict[bytes, List[CodeIssue]]" = OrderedDict()
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+_ANALYSIS_CACHE_MAX = 256
+
+# Per-function memo keyed by subtree hash: re-analysis of an edited
+# file only re-walks the definitions that actually changed. Module
+# level with the same locking discipline as _ANALYSIS_CACHE - the
+# production paths build a fresh analyzer per task, so an instance
+# cache would be permanently cold and hashing would be pure overhead.
+_FN_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_FN_CACHE_LOCK = threading.Lock()
+_FN_CACHE_MAX = 1024
+
+# Pluggable add-on rules: each is a pure function taking the parsed
+# tree and returning a list of CodeIssue. The built-in checks stay fused
+# in the single-pass walker — splitting them out would reintroduce one
+# traversal per rule — but add-on rules run concurrently in a thread
+# pool, which pays off when they do I/O (config lookups, databases) and
+# scales fully on free-threaded CPython builds.
+EXTRA_RULES: List[Any] = []
+
+def _analyze_one(code: str) -> List[Dict[str, Any]]:
+    """Analyze a single source in a worker process (must stay picklable)"""
+    return [issue.to_dict() for issue in ASTAnalyzer().analyze(code)]
+
+class ASTAnalyzer:
     """Static code analyzer using Python's AST module"""
-    
-    def __init__(self):
+
+    def __init__(self) -> None:
         self.issues: List[CodeIssue] = []
+        # Packed (line << 32 | column) per issue: ordering sorts this
+        # flat int list instead of touching every CodeIssue object
+        self._sort_keys: List[int] = []
         self.defined_vars: Set[str] = set()
         self.used_vars: Set[str] = set()
         self.imported_names: Set[str] = set()
         self.used_imports: Set[str] = set()
-        self.function_returns: Dict[str, List[ast.AST]] = {}
-        self.current_function: str = None
-        
+        self.function_returns: Dict[str, List[ast.Return]] = {}
+        self.current_function: Optional[str] = None
+        # Loop frames for while-True loops awaiting a break statement
+        self._loop_stack: List[list] = []
+        # Enclosing function names, innermost last
+        self._func_stack: List[str] = []
+
+    def _reset(self) -> None:
+        """Clear per-run state so one instance can analyze many sources.
+
+        Without this, issues and name sets from earlier calls leak into
+        later results (and from there into the caches).
+        """
+        self.issues = []
+        self._sort_keys = []
+        self.defined_vars = set()
+        self.used_vars = set()
+        self.imported_names = set()
+        self.used_imports = set()
+        self.function_returns = {}
+        self.current_function = None
+        self._loop_stack = []
+        self._func_stack = []
+
     def analyze(self, code: str) -> List[CodeIssue]:
         """Main entry point for code analysis"""
+        self._reset()
+        key = hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest()
+        with _ANALYSIS_CACHE_LOCK:
+            cached = _ANALYSIS_CACHE.get(key)
+            if cached is not None:
+                _ANALYSIS_CACHE.move_to_end(key)
+                return list(cached)
         try:
+            # ast.parse re-parses the whole source (C-level, no
+            # incremental reuse). An incremental parser such as
+            # tree-sitter would reuse unchanged subtrees across edits,
+            # but every check here is written against ast node types;
+            # instead, edit-time cost is bounded by the per-function
+            # memo below, which skips re-walking unchanged definitions.
             tree = ast.parse(code)
-            self.visit(tree)
+            self._walk_incremental(tree)
+            if EXTRA_RULES:
+                with ThreadPoolExecutor(max_workers=len(EXTRA_RULES)) as executor:
+                    for rule_issues in executor.map(lambda rule: rule(tree), EXTRA_RULES):
+                        for issue in rule_issues:
+                            self._emit(issue)
+            # Deferred so it holds regardless of the order cached and
+            # fresh subtrees were combined in
+            self.used_imports = self.used_vars & self.imported_names
             self._check_unused_imports()
             self._check_unused_variables()
-            return sorted(self.issues, key=lambda x: (x.line, x.column))
+            keys = self._sort_keys
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            issues = [self.issues[i] for i in order]
+            with _ANALYSIS_CACHE_LOCK:
+                _ANALYSIS_CACHE[key] = list(issues)
+                if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+                    _ANALYSIS_CACHE.popitem(last=False)
+            return issues
         except SyntaxError as e:
             return [CodeIssue(
                 line=e.lineno or 0,
                 column=e.offset or 0,
                 severity=IssueSeverity.ERROR,
-                category="syntax",
+                category=_CAT_SYNTAX,
                 message=f"Syntax error: {e.msg}",
                 suggestion="Fix the syntax error before proceeding"
             )]
@@ -57,178 +170,301 @@ class ASTAnalyzer(ast.NodeVisitor):
                 line=0,
                 column=0,
                 severity=IssueSeverity.ERROR,
-                category="parsing",
+                category=_CAT_PARSING,
                 message=f"Failed to parse code: {str(e)}",
                 suggestion="Ensure the code is valid Python"
             )]
-    
-    def visit_Import(self, node: ast.Import):
+
+    @classmethod
+    def analyze_many(cls, sources: List[str]) -> List[List[Dict[str, Any]]]:
+        """Analyze several sources in parallel across worker processes.
+
+        Each file is independent, so the CPU-bound walk fans out to a
+        ProcessPoolExecutor (threads would serialize on the GIL). Results
+        come back as to_dict()-ified issue lists in input order.
+        """
+        if not sources:
+            return []
+        ncpu = os.cpu_count() or 1
+        workers = min(ncpu, len(sources))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(sources) // (4 * ncpu))
+            return list(executor.map(_analyze_one, sources, chunksize=chunksize))
+
+    def _walk_incremental(self, tree: ast.Module) -> None:
+        """Walk a module, reusing cached results for unchanged functions.
+
+        Top-level function and class definitions are independent units:
+        their issues and name sets depend only on their own subtree. Each
+        is keyed by a hash of its dump (attributes included, so a
+        definition that merely moved re-analyzes with correct line
+        numbers) and replayed from the memo when unchanged. Everything
+        else at module scope is walked normally.
+        """
+        for stmt in tree.body:
+            stmt_type = type(stmt)
+            if stmt_type not in (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef):
+                self._walk(stmt)
+                continue
+            key = hashlib.blake2b(
+                ast.dump(stmt, annotate_fields=False, include_attributes=True).encode(),
+                digest_size=16
+            ).digest()
+            with _FN_CACHE_LOCK:
+                cached = _FN_CACHE.get(key)
+                if cached is not None:
+                    _FN_CACHE.move_to_end(key)
+            if cached is None:
+                sub = ASTAnalyzer()
+                sub._walk(stmt)
+                cached = (
+                    tuple(sub.issues),
+                    frozenset(sub.defined_vars),
+                    frozenset(sub.used_vars),
+                    frozenset(sub.imported_names),
+                )
+                with _FN_CACHE_LOCK:
+                    _FN_CACHE[key] = cached
+                    if len(_FN_CACHE) > _FN_CACHE_MAX:
+                        _FN_CACHE.popitem(last=False)
+            fn_issues, defined, used, imported = cached
+            for issue in fn_issues:
+                self._emit(issue)
+            self.defined_vars |= defined
+            self.used_vars |= used
+            self.imported_names |= imported
+
+    def _emit(self, issue: CodeIssue) -> None:
+        """Record an issue along with its packed ordering key"""
+        self.issues.append(issue)
+        self._sort_keys.append((issue.line << 32) | issue.column)
+
+    def _walk(self, tree: ast.AST) -> None:
+        """Single-pass iterative traversal running every check inline.
+
+        Each node is visited exactly once; nodes that need post-processing
+        (functions, while loops) get an exit frame that fires after all of
+        their children have been handled. This replaces the NodeVisitor
+        dispatch and the per-While ast.walk rescan for break statements,
+        which re-traversed every nested subtree.
+        """
+        handlers = _HANDLERS
+        exit_handlers = _EXIT_HANDLERS
+        stack: "deque[Tuple[ast.AST, bool]]" = deque()
+        stack.append((tree, False))
+        while stack:
+            node, exiting = stack.pop()
+            node_type = type(node)
+            if exiting:
+                exit_handlers[node_type](self, node)
+                continue
+            handler = handlers.get(node_type)
+            if handler:
+                handler(self, node)
+            if node_type in exit_handlers:
+                # Pushed before children so it pops after them
+                stack.append((node, True))
+            for child in ast.iter_child_nodes(node):
+                stack.append((child, False))
+
+    def _on_import(self, node: ast.Import) -> None:
         """Track imports"""
         for alias in node.names:
             name = alias.asname if alias.asname else alias.name
             self.imported_names.add(name)
-        self.generic_visit(node)
-    
-    def visit_ImportFrom(self, node: ast.ImportFrom):
+
+    def _on_import_from(self, node: ast.ImportFrom) -> None:
         """Track from imports"""
         for alias in node.names:
             name = alias.asname if alias.asname else alias.name
             self.imported_names.add(name)
-        self.generic_visit(node)
-    
-    def visit_Name(self, node: ast.Name):
+
+    def _on_name(self, node: ast.Name) -> None:
         """Track variable usage and definitions"""
-        if isinstance(node.ctx, ast.Store):
+        ctx = type(node.ctx)
+        if ctx is ast.Store:
             self.defined_vars.add(node.id)
-        elif isinstance(node.ctx, ast.Load):
+        elif ctx is ast.Load:
             self.used_vars.add(node.id)
-            if node.id in self.imported_names:
-                self.used_imports.add(node.id)
-        self.generic_visit(node)
-    
-    def visit_FunctionDef(self, node: ast.FunctionDef):
+
+    def _on_function_def(self, node: ast.FunctionDef) -> None:
         """Analyze function definitions"""
+        self._func_stack.append(node.name)
         self.current_function = node.name
         self.function_returns[node.name] = []
-        
+
         # Check for unreachable code after return
         self._check_unreachable_code(node.body)
-        
+
         # Store function name as defined
         self.defined_vars.add(node.name)
-        
-        self.generic_visit(node)
-        
-        # Check return type consistency
+
+    def _on_function_def_exit(self, node: ast.FunctionDef) -> None:
+        """Finish a function once all its children have been visited"""
         self._check_return_consistency(node)
-        self.current_function = None
-    
-    def visit_Return(self, node: ast.Return):
+        self._func_stack.pop()
+        self.current_function = self._func_stack[-1] if self._func_stack else None
+
+    def _on_return(self, node: ast.Return) -> None:
         """Track return statements"""
         if self.current_function:
             self.function_returns[self.current_function].append(node)
-        self.generic_visit(node)
-    
-    def visit_If(self, node: ast.If):
+
+    def _on_break(self, node: ast.Break) -> None:
+        """Mark every enclosing while-True loop as having a break"""
+        for frame in self._loop_stack:
+            frame[1] = True
+
+    def _on_if(self, node: ast.If) -> None:
         """Check for suspicious if conditions"""
+        # ast.Constant/ast.Compare are effectively final, so a pointer
+        # compare on type() beats isinstance's MRO walk in this hot path
+        test = node.test
+        test_type = type(test)
+
         # Check for constant conditions
-        if isinstance(node.test, ast.Constant):
-            self.issues.append(CodeIssue(
+        if test_type is ast.Constant:
+            self._emit(CodeIssue(
                 line=node.lineno,
                 column=node.col_offset,
                 severity=IssueSeverity.WARNING,
-                category="logic",
-                message=f"Condition is always {node.test.value}",
+                category=_CAT_LOGIC,
+                message=f"Condition is always {cast(ast.Constant, test).value!r}",
                 suggestion="Remove the if statement or fix the condition"
             ))
-        
+
         # Check for comparison with True/False
-        if isinstance(node.test, ast.Compare):
-            for comparator in node.test.comparators:
-                if isinstance(comparator, ast.Constant) and isinstance(comparator.value, bool):
-                    self.issues.append(CodeIssue(
+        if test_type is ast.Compare:
+            for comparator in cast(ast.Compare, test).comparators:
+                if (type(comparator) is ast.Constant
+                        and type(cast(ast.Constant, comparator).value) is bool):
+                    self._emit(CodeIssue(
                         line=node.lineno,
                         column=node.col_offset,
                         severity=IssueSeverity.WARNING,
-                        category="style",
+                        category=_CAT_STYLE,
                         message="Avoid comparing with True/False explicitly",
                         suggestion="Use 'if var:' instead of 'if var == True:'"
                     ))
-        
-        self.generic_visit(node)
-    
-    def visit_While(self, node: ast.While):
-        """Check for infinite loops"""
-        if isinstance(node.test, ast.Constant) and node.test.value == True:
-            # Check if there's a break statement
-            has_break = any(isinstance(n, ast.Break) for n in ast.walk(node))
+
+    def _on_while(self, node: ast.While) -> None:
+        """Open a loop frame; the break flag is filled in during the walk"""
+        if type(node.test) is ast.Constant and cast(ast.Constant, node.test).value == True:
+            self._loop_stack.append([node, False])
+
+    def _on_while_exit(self, node: ast.While) -> None:
+        """Check for infinite loops once the loop body has been visited"""
+        if self._loop_stack and self._loop_stack[-1][0] is node:
+            _, has_break = self._loop_stack.pop()
             if not has_break:
-                self.issues.append(CodeIssue(
+                self._emit(CodeIssue(
                     line=node.lineno,
                     column=node.col_offset,
                     severity=IssueSeverity.WARNING,
-                    category="logic",
+                    category=_CAT_LOGIC,
                     message="Potential infinite loop without break statement",
                     suggestion="Add a break condition or use a different loop structure"
                 ))
-        self.generic_visit(node)
-    
-    def visit_Except(self, node: ast.ExceptHandler):
+
+    def _on_except(self, node: ast.ExceptHandler) -> None:
         """Check for bare except clauses"""
         if node.type is None:
-            self.issues.append(CodeIssue(
+            self._emit(CodeIssue(
                 line=node.lineno,
                 column=node.col_offset,
                 severity=IssueSeverity.WARNING,
-                category="best_practice",
+                category=_CAT_BEST_PRACTICE,
                 message="Bare except clause catches all exceptions",
                 suggestion="Specify exception types or use 'except Exception:'"
             ))
-        self.generic_visit(node)
-    
-    def _check_unreachable_code(self, body: List[ast.AST]):
+
+    def _check_unreachable_code(self, body: List[ast.stmt]) -> None:
         """Detect code after return/raise statements"""
-        for i, stmt in enumerate(body):
-            if isinstance(stmt, (ast.Return, ast.Raise)):
-                if i < len(body) - 1:
-                    next_stmt = body[i + 1]
-                    self.issues.append(CodeIssue(
-                        line=next_stmt.lineno,
-                        column=next_stmt.col_offset,
-                        severity=IssueSeverity.ERROR,
-                        category="logic",
-                        message="Unreachable code after return/raise",
-                        suggestion="Remove or move this code before the return/raise"
-                    ))
-    
-    def _check_return_consistency(self, node: ast.FunctionDef):
+        # Only the first terminator matters: any later return/raise is
+        # itself part of the unreachable tail we already reported
+        for i in range(len(body) - 1):
+            stmt_type = type(body[i])
+            if stmt_type is ast.Return or stmt_type is ast.Raise:
+                next_stmt = body[i + 1]
+                self._emit(CodeIssue(
+                    line=next_stmt.lineno,
+                    column=next_stmt.col_offset,
+                    severity=IssueSeverity.ERROR,
+                    category=_CAT_LOGIC,
+                    message="Unreachable code after return/raise",
+                    suggestion="Remove or move this code before the return/raise"
+                ))
+                break
+
+    def _check_return_consistency(self, node: ast.FunctionDef) -> None:
         """Check if function returns are consistent"""
         returns = self.function_returns.get(node.name, [])
         if not returns:
             return
-        
+
         has_value = [r.value is not None for r in returns]
         if any(has_value) and not all(has_value):
-            self.issues.append(CodeIssue(
+            self._emit(CodeIssue(
                 line=node.lineno,
                 column=node.col_offset,
                 severity=IssueSeverity.WARNING,
-                category="logic",
+                category=_CAT_LOGIC,
                 message=f"Function '{node.name}' has inconsistent return statements",
                 suggestion="Ensure all code paths return a value or all return None"
             ))
-    
-    def _check_unused_imports(self):
+
+    def _check_unused_imports(self) -> None:
         """Identify imports that are never used"""
         unused = self.imported_names - self.used_imports
         for name in unused:
-            self.issues.append(CodeIssue(
+            self._emit(CodeIssue(
                 line=1,  # We don't track exact line for imports in this simple version
                 column=0,
                 severity=IssueSeverity.INFO,
-                category="unused",
+                category=_CAT_UNUSED,
                 message=f"Imported '{name}' is never used",
                 suggestion=f"Remove the import or use '{name}' in your code"
             ))
-    
-    def _check_unused_variables(self):
+
+    def _check_unused_variables(self) -> None:
         """Identify variables that are defined but never used"""
         # Exclude special names and built-ins
-        builtins = set(dir(__builtins__))
-        unused = (self.defined_vars - self.used_vars) - builtins
+        unused = (self.defined_vars - self.used_vars) - _BUILTINS
         # Filter out common patterns like _ or variables starting with _
         unused = {v for v in unused if not v.startswith('_')}
-        
+
         for name in unused:
-            self.issues.append(CodeIssue(
+            self._emit(CodeIssue(
                 line=0,
                 column=0,
                 severity=IssueSeverity.INFO,
-                category="unused",
+                category=_CAT_UNUSED,
                 message=f"Variable '{name}' is defined but never used",
                 suggestion=f"Remove '{name}' or use it in your code"
             ))
 
+# Type-keyed dispatch tables shared by all instances: one dict lookup
+# and call per node instead of NodeVisitor's 'visit_<Name>' getattr, and
+# no per-instance bound-method dicts to rebuild in __init__. These are
+# module globals (reading methods off the class, never assigning onto
+# it) so the module type-checks and stays compilable with mypyc, which
+# forbids post-class attribute assignment on native classes.
+_HANDLERS: Dict[type, Callable[[ASTAnalyzer, Any], None]] = {
+    ast.Import: ASTAnalyzer._on_import,
+    ast.ImportFrom: ASTAnalyzer._on_import_from,
+    ast.Name: ASTAnalyzer._on_name,
+    ast.FunctionDef: ASTAnalyzer._on_function_def,
+    ast.Return: ASTAnalyzer._on_return,
+    ast.Break: ASTAnalyzer._on_break,
+    ast.If: ASTAnalyzer._on_if,
+    ast.While: ASTAnalyzer._on_while,
+    ast.ExceptHandler: ASTAnalyzer._on_except,
+}
+_EXIT_HANDLERS: Dict[type, Callable[[ASTAnalyzer, Any], None]] = {
+    ast.FunctionDef: ASTAnalyzer._on_function_def_exit,
+    ast.While: ASTAnalyzer._on_while_exit,
+}
+
 # Example usage
 if __name__ == "__main__":
     sample_code = """
@@ -240,7 +476,7 @@ def calculate(x):
         result = x * 2
         return result
         print("This won't execute")
-    
+
 def process():
     return 5
     unused_var = 10
@@ -250,10 +486,10 @@ def inconsistent_return(flag):
         return True
     # Missing return for else case
 """
-    
+
     analyzer = ASTAnalyzer()
     issues = analyzer.analyze(sample_code)
-    
+
     for issue in issues:
         print(f"[{issue.severity.value.upper()}] Line {issue.line}: {issue.message}")
-        print(f"  Suggestion: {issue.suggestion}\n")
\ No newline at end of file
+        print(f"  Suggestion: {issue.suggestion}\n")
@@ -1,11 +1,66 @@
-import json
+import asyncio
 import re
-from typing import List, Dict, Any, Optional
+import time
+from collections import defaultdict
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import anthropic
 import openai
+import orjson
+import requests
 from enum import Enum
 
+try:
+    # C++ token-set similarity, 10-100x faster than the Python fallback
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+# Shared keep-alive session for the local Ollama backend; opening a new
+# TCP connection per call dominated short-prompt latency on localhost
+_LOCAL_SESSION = requests.Session()
+_LOCAL_SESSION.mount('http://', requests.adapters.HTTPAdapter(
+    pool_connections=8, pool_maxsize=8
+))
+
+# Closed severity set mapped to sort ranks once at issue construction,
+# so ordering merged results is a C-level int compare per element
+_SEVERITY_RANK = {"error": 0, "warning": 1, "info": 2}
+
+# Precompiled response-parsing patterns; compiling per call paid the
+# pattern hash/lookup on every LLM response
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_LINE_REF_RE = re.compile(r'[Ll]ine\s+(\d+)[:.\s]+(.*?)(?=\n[Ll]ine|\n\n|$)', re.DOTALL)
+
+# Static review rubric, identical for every request. Kept out of the
+# per-call prompt so providers can cache the prefix: Anthropic via
+# cache_control on the system block, OpenAI automatically for repeated
+# system messages. Only the code + AST context are billed fresh.
+_STATIC_SYSTEM_PROMPT = """You are an expert code reviewer. Analyze the Python code you are given for:
+
+1. **Logic errors**: Bugs, incorrect algorithms, edge cases not handled
+2. **Bad practices**: Anti-patterns, code smells, maintainability issues
+3. **Security vulnerabilities**: SQL injection, XSS, insecure data handling
+4. **Performance issues**: Inefficient algorithms, unnecessary operations
+5. **Missing edge cases**: Null checks, boundary conditions, error handling
+
+Please provide feedback in the following JSON format:
+{
+  "issues": [
+    {
+      "line": <line_number>,
+      "severity": "error|warning|info",
+      "category": "logic|security|performance|style|edge_case",
+      "message": "Brief description of the issue",
+      "suggestion": "Specific recommendation to fix",
+      "reasoning": "Why this is an issue"
+    }
+  ]
+}
+
+Provide only valid JSON in your response, no additional text."""
+
 class LLMProvider(Enum):
     ANTHROPIC = "anthropic"
     OPENAI = "openai"
@@ -30,13 +85,16 @@ class LLMCodeReviewer:
         
         if provider == LLMProvider.ANTHROPIC:
             self.client = anthropic.Anthropic(api_key=api_key)
+            self.aclient = anthropic.AsyncAnthropic(api_key=api_key)
             self.model = model or "claude-sonnet-4-20250514"
         elif provider == LLMProvider.OPENAI:
             self.client = openai.OpenAI(api_key=api_key)
+            self.aclient = openai.AsyncOpenAI(api_key=api_key)
             self.model = model or "gpt-4"
         else:
             # For local models, you'd use something like Ollama
             self.client = None
+            self.aclient = None
             self.model = model or "codellama"
     
     def review_code(self, code: str, ast_issues: List[Dict[str, Any]], 
@@ -52,15 +110,15 @@ class LLMCodeReviewer:
         Returns:
             List of LLMIssue objects
         """
-        prompt = self._build_prompt(code, ast_issues, focus_areas)
-        
+        user_content = self._build_user_content(code, ast_issues, focus_areas)
+
         try:
             if self.provider == LLMProvider.ANTHROPIC:
-                response = self._call_anthropic(prompt)
+                response = self._call_anthropic(user_content)
             elif self.provider == LLMProvider.OPENAI:
-                response = self._call_openai(prompt)
+                response = self._call_openai(user_content)
             else:
-                response = self._call_local(prompt)
+                response = self._call_local(_STATIC_SYSTEM_PROMPT + "\n\n" + user_content)
             
             return self._parse_llm_response(response, code)
         
@@ -68,67 +126,174 @@ class LLMCodeReviewer:
             print(f"LLM API error: {str(e)}")
             return []
     
-    def _build_prompt(self, code: str, ast_issues: List[Dict[str, Any]], 
-                     focus_areas: Optional[List[str]] = None) -> str:
-        """Construct the prompt for LLM review"""
-        
+    async def review_code_async(self, code: str, ast_issues: List[Dict[str, Any]],
+                                focus_areas: Optional[List[str]] = None) -> List[LLMIssue]:
+        """Async variant of review_code for concurrent multi-file reviews.
+
+        Uses the provider's async client so several reviews can overlap
+        their network latency instead of serializing 1-10s round-trips.
+        """
+        user_content = self._build_user_content(code, ast_issues, focus_areas)
+
+        try:
+            if self.provider == LLMProvider.ANTHROPIC:
+                response = await self._call_anthropic_async(user_content)
+            elif self.provider == LLMProvider.OPENAI:
+                response = await self._call_openai_async(user_content)
+            else:
+                # Ollama path is synchronous requests; push it to a thread
+                response = await asyncio.to_thread(
+                    self._call_local, _STATIC_SYSTEM_PROMPT + "\n\n" + user_content
+                )
+
+            return self._parse_llm_response(response, code)
+
+        except Exception as e:
+            print(f"LLM API error: {str(e)}")
+            return []
+
+    async def review_many(self, codes: List[str],
+                          ast_issues_list: List[List[Dict[str, Any]]],
+                          focus_areas: Optional[List[str]] = None,
+                          max_concurrency: int = 8) -> List[List[LLMIssue]]:
+        """Review several code snippets concurrently.
+
+        A semaphore caps in-flight requests so we respect provider QPS;
+        results come back in input order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(code: str, ast_issues: List[Dict[str, Any]]) -> List[LLMIssue]:
+            async with semaphore:
+                return await self.review_code_async(code, ast_issues, focus_areas)
+
+        return list(await asyncio.gather(
+            *(_one(c, a) for c, a in zip(codes, ast_issues_list))
+        ))
+
+    def supports_batch(self) -> bool:
+        """Whether the provider offers a server-side batch API"""
+        return self.provider == LLMProvider.ANTHROPIC
+
+    async def review_batch(self, codes: List[str],
+                           ast_issues_list: List[List[Dict[str, Any]]],
+                           focus_areas: Optional[List[str]] = None,
+                           poll_interval: float = 2.0,
+                           timeout: float = 600.0
+                           ) -> List[Union[List[LLMIssue], Exception]]:
+        """Review snippets through the provider's batch API.
+
+        Anthropic Message Batches take every prompt in one submission at
+        half the per-token cost and schedule them server-side, so there
+        is no client round-trip per snippet. OpenAI's batch API needs a
+        JSONL file-upload round-trip, which doesn't pay off at this
+        batch size, so other providers fall back to concurrent
+        per-snippet calls.
+
+        Entries the provider reports as errored, expired or canceled
+        come back as Exception objects in their slot, so callers can
+        report them per-snippet instead of mistaking them for clean
+        reviews.
+        """
+        if self.provider != LLMProvider.ANTHROPIC:
+            return await self.review_many(codes, ast_issues_list, focus_areas)
+
+        batch_requests = []
+        for i, (code, ast_issues) in enumerate(zip(codes, ast_issues_list)):
+            batch_requests.append({
+                "custom_id": str(i),
+                "params": {
+                    "model": self.model,
+                    "max_tokens": 4000,
+                    "system": [{
+                        "type": "text",
+                        "text": _STATIC_SYSTEM_PROMPT,
+                        "cache_control": {"type": "ephemeral"}
+                    }],
+                    "messages": [{
+                        "role": "user",
+                        "content": self._build_user_content(code, ast_issues, focus_areas)
+                    }],
+                },
+            })
+
+        batch = await self.aclient.messages.batches.create(requests=batch_requests)
+
+        # Poll with exponential backoff until the provider finishes
+        deadline = time.monotonic() + timeout
+        delay = poll_interval
+        while True:
+            batch = await self.aclient.messages.batches.retrieve(batch.id)
+            if batch.processing_status == "ended":
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch.id} did not finish within {timeout}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+        results: List[Union[List[LLMIssue], Exception]] = [
+            RuntimeError("batch produced no result for this snippet")
+            for _ in codes
+        ]
+        async for entry in await self.aclient.messages.batches.results(batch.id):
+            idx = int(entry.custom_id)
+            if entry.result.type == "succeeded":
+                text = entry.result.message.content[0].text
+                results[idx] = self._parse_llm_response(text, codes[idx])
+            else:
+                results[idx] = RuntimeError(
+                    f"batch entry {entry.result.type}"
+                )
+        return results
+
+    def _build_user_content(self, code: str, ast_issues: List[Dict[str, Any]],
+                            focus_areas: Optional[List[str]] = None) -> str:
+        """Construct the dynamic (per-request) part of the prompt"""
+
         # Format AST issues for context
         ast_context = ""
         if ast_issues:
             ast_context = "Static analysis found these issues:\n"
             for issue in ast_issues[:10]:  # Limit to avoid token overflow
                 ast_context += f"- Line {issue['line']}: {issue['message']}\n"
-        
+
         focus_text = ""
         if focus_areas:
             focus_text = f"\nPay special attention to: {', '.join(focus_areas)}"
-        
-        prompt = f"""You are an expert code reviewer. Analyze the following Python code for:
-
-1. **Logic errors**: Bugs, incorrect algorithms, edge cases not handled
-2. **Bad practices**: Anti-patterns, code smells, maintainability issues
-3. **Security vulnerabilities**: SQL injection, XSS, insecure data handling
-4. **Performance issues**: Inefficient algorithms, unnecessary operations
-5. **Missing edge cases**: Null checks, boundary conditions, error handling
-
-{ast_context}
 
+        return f"""{ast_context}
 {focus_text}
 
-Please provide feedback in the following JSON format:
-{{
-  "issues": [
-    {{
-      "line": <line_number>,
-      "severity": "error|warning|info",
-      "category": "logic|security|performance|style|edge_case",
-      "message": "Brief description of the issue",
-      "suggestion": "Specific recommendation to fix",
-      "reasoning": "Why this is an issue"
-    }}
-  ]
-}}
-
 Code to review:
 
 ```python
 {code}
-```
+```"""
 
-Provide only valid JSON in your response, no additional text."""
-
-        return prompt
+    def _build_prompt(self, code: str, ast_issues: List[Dict[str, Any]],
+                      focus_areas: Optional[List[str]] = None) -> str:
+        """Full prompt for providers without a separate system channel"""
+        return _STATIC_SYSTEM_PROMPT + "\n\n" + self._build_user_content(
+            code, ast_issues, focus_areas
+        )
     
     def _call_anthropic(self, prompt: str) -> str:
-        """Call Anthropic's Claude API"""
-        message = self.client.messages.create(
+        """Call Anthropic's Claude API, streaming the response text"""
+        with self.client.messages.stream(
             model=self.model,
             max_tokens=4000,
+            system=[{
+                "type": "text",
+                "text": _STATIC_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"}
+            }],
             messages=[
                 {"role": "user", "content": prompt}
             ]
-        )
-        return message.content[0].text
+        ) as stream:
+            # Accumulate as chunks arrive instead of blocking on the
+            # fully-buffered response
+            return "".join(stream.text_stream)
     
     def _call_openai(self, prompt: str) -> str:
         """Call OpenAI's API"""
@@ -142,18 +307,54 @@ Provide only valid JSON in your response, no additional text."""
         )
         return response.choices[0].message.content
     
+    async def _call_anthropic_async(self, prompt: str) -> str:
+        """Call Anthropic's Claude API without blocking the event loop"""
+        async with self.aclient.messages.stream(
+            model=self.model,
+            max_tokens=4000,
+            system=[{
+                "type": "text",
+                "text": _STATIC_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            chunks = []
+            async for text in stream.text_stream:
+                chunks.append(text)
+            return "".join(chunks)
+
+    async def _call_openai_async(self, prompt: str) -> str:
+        """Call OpenAI's API without blocking the event loop"""
+        response = await self.aclient.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": _STATIC_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            stream=True
+        )
+        chunks = []
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+        return "".join(chunks)
+
     def _call_local(self, prompt: str) -> str:
         """Call local LLM (e.g., via Ollama)"""
         # Example with Ollama API
-        import requests
-        
-        response = requests.post(
+        response = _LOCAL_SESSION.post(
             "http://localhost:11434/api/generate",
             json={
                 "model": self.model,
                 "prompt": prompt,
                 "stream": False
-            }
+            },
+            timeout=60
         )
         return response.json().get("response", "")
     
@@ -161,12 +362,13 @@ Provide only valid JSON in your response, no additional text."""
         """Parse LLM response into structured issues"""
         try:
             # Extract JSON from response (handle markdown code blocks)
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response, re.DOTALL)
+            json_match = _JSON_BLOCK_RE.search(response)
             if json_match:
                 response = json_match.group(1)
             
-            # Try to parse as JSON
-            data = json.loads(response)
+            # Try to parse as JSON (orjson: SIMD-accelerated, 2-3x
+            # faster than stdlib json on multi-kB issue arrays)
+            data = orjson.loads(response)
             issues = []
             
             for issue_data in data.get("issues", []):
@@ -187,7 +389,7 @@ Provide only valid JSON in your response, no additional text."""
             
             return issues
         
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # Fallback: try to extract issues from unstructured text
             return self._extract_issues_from_text(response)
     
@@ -196,8 +398,7 @@ Provide only valid JSON in your response, no additional text."""
         issues = []
         
         # Try to find line references like "Line 5:" or "line 10:"
-        line_pattern = r'[Ll]ine\s+(\d+)[:.\s]+(.*?)(?=\n[Ll]ine|\n\n|$)'
-        matches = re.finditer(line_pattern, text, re.DOTALL)
+        matches = _LINE_REF_RE.finditer(text)
         
         for match in matches:
             line_num = int(match.group(1))
@@ -235,43 +436,56 @@ class ResultMerger:
         """
         # Convert LLM issues to dict format
         all_issues = list(ast_issues)
-        
+
+        # Duplicates can only share a line number, so bucket existing
+        # issues by line and cache each message's token set once instead
+        # of the old full scan that re-split every message per comparison
+        by_line: Dict[int, List[tuple]] = defaultdict(list)
+        for existing in all_issues:
+            if "severity_rank" not in existing:
+                existing["severity_rank"] = _SEVERITY_RANK.get(existing.get("severity"), 3)
+            words = frozenset(existing["message"].lower().split())
+            by_line[existing["line"]].append((existing, words))
+
         for llm_issue in llm_issues:
             issue_dict = {
                 "line": llm_issue.line,
                 "column": 0,
                 "severity": llm_issue.severity,
+                "severity_rank": _SEVERITY_RANK.get(llm_issue.severity, 3),
                 "category": llm_issue.category,
                 "message": llm_issue.message,
                 "suggestion": llm_issue.suggestion,
                 "source": "llm",
                 "reasoning": llm_issue.reasoning
             }
-            
+            llm_words = frozenset(llm_issue.message.lower().split())
+
             # Check for duplicates (same line, similar message)
             is_duplicate = False
-            for existing in all_issues:
-                if (existing["line"] == issue_dict["line"] and 
-                    ResultMerger._similarity(existing["message"], issue_dict["message"]) > 0.7):
+            for existing, existing_words in by_line.get(llm_issue.line, ()):
+                if fuzz is not None:
+                    score = fuzz.token_set_ratio(existing["message"], llm_issue.message) / 100.0
+                else:
+                    score = ResultMerger._similarity(existing_words, llm_words)
+                if score > 0.7:
                     # Merge information from both sources
                     existing["suggestion"] += f" (LLM: {issue_dict['suggestion']})"
                     existing["source"] = "ast+llm"
                     is_duplicate = True
                     break
-            
+
             if not is_duplicate:
                 all_issues.append(issue_dict)
+                by_line[llm_issue.line].append((issue_dict, llm_words))
         
-        # Sort by severity (error > warning > info) then by line number
-        severity_order = {"error": 0, "warning": 1, "info": 2}
-        return sorted(all_issues, 
-                     key=lambda x: (severity_order.get(x["severity"], 3), x["line"]))
+        # Sort by severity (error > warning > info) then by line number;
+        # ranks were baked in above so the key is a C-level itemgetter
+        return sorted(all_issues, key=itemgetter("severity_rank", "line"))
     
     @staticmethod
-    def _similarity(text1: str, text2: str) -> float:
-        """Simple similarity check between two strings"""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+    def _similarity(words1: frozenset, words2: frozenset) -> float:
+        """Jaccard similarity between two pre-tokenized messages"""
         if not words1 or not words2:
             return 0.0
         intersection = words1.intersection(words2)
@@ -1,44 +1,196 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+import asyncio
+import concurrent.futures
 import os
-from typing import Dict, Any, List
-import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional
 import time
 
-# Import our analyzer modules
+import orjson
+import redis
+import xxhash
+from cachetools import TTLCache
+
+# Import our analyzer modules. llm_integration is imported lazily in
+# CodeReviewService.__init__: it drags in the anthropic/openai SDKs,
+# which AST-only deployments (no LLM_API_KEY) never need.
 from analyzers.ast_analyzer import ASTAnalyzer, CodeIssue
-from analyzers.llm_integration import LLMCodeReviewer, LLMProvider, ResultMerger
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend requests
 
-# Rate limiting
+# Rate limiting. Counters live in Redis so the limits hold globally
+# across gunicorn workers - with memory:// each worker kept its own
+# counter, multiplying every limit by the worker count and forgetting it
+# on restart. Falls back in-memory when Redis is down rather than
+# failing requests.
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
     default_limits=["100 per hour"],
-    storage_uri="memory://"
+    storage_uri=os.environ.get("LIMITER_STORAGE", "redis://localhost:6379/0"),
+    storage_options={"socket_connect_timeout": 1},
+    strategy="moving-window",
+    in_memory_fallback_enabled=True
 )
 
-# Cache for analysis results
-analysis_cache = {}
+def ojson(obj: Any, status: int = 200):
+    """Serialize a response with orjson instead of jsonify.
+
+    orjson emits bytes directly and is several times faster than the
+    stdlib encoder jsonify uses; on responses carrying large issue
+    lists, serialization was a visible slice of response time.
+    """
+    return app.response_class(orjson.dumps(obj), status=status,
+                              mimetype="application/json")
+
+# Cache for analysis results: bounded LRU with TTL. The previous bare
+# dict grew without limit and only ever dropped entries lazily on hit,
+# so cold entries leaked until restart. Flask async views run across
+# threads, hence the lock around cache access.
 CACHE_TTL = 3600  # 1 hour
+# Part of every cache key: bump (or set from the deploy pipeline) when
+# the LLM model or prompt changes so cached reviews are never stale
+_MODEL_VERSION = os.environ.get("MODEL_VERSION", "1")
+# Responses above this size are served but never cached
+MAX_CACHED_BYTES = int(os.environ.get("MAX_CACHED_BYTES", 1 << 20))  # 1MB
+analysis_cache = TTLCache(maxsize=int(os.environ.get("CACHE_MAX", 1024)), ttl=CACHE_TTL)
+# AST results depend only on the code, so they get their own level:
+# repeat requests that differ only in LLM parameters (use_llm,
+# focus_areas) reuse the parsed result instead of re-running analysis
+ast_cache = TTLCache(maxsize=int(os.environ.get("CACHE_MAX", 1024)), ttl=CACHE_TTL)
+cache_lock = threading.Lock()
+
+# Shared cache backend: under `gunicorn -w N` the in-process cache is
+# duplicated per worker, so the same code gets analyzed up to N times.
+# Redis (configure `maxmemory-policy allkeys-lru`) gives every worker the
+# same hits and moves eviction to the cache server. If Redis is not
+# reachable at startup we fall back to the in-process TTLCache above.
+redis_client = None
+try:
+    _candidate = redis.Redis.from_url(
+        os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+        socket_connect_timeout=1,
+        socket_timeout=1,
+    )
+    _candidate.ping()
+    redis_client = _candidate
+    print("✓ Redis cache backend connected")
+except Exception as e:
+    print(f"⚠ Redis unavailable ({e}), using in-process cache")
+
+def cache_get(key: str) -> Optional[bytes]:
+    """Fetch a cached serialized response, preferring the shared backend."""
+    if redis_client is not None:
+        try:
+            return redis_client.get(key)
+        except redis.RedisError:
+            pass  # Redis hiccup: degrade to the local cache
+    with cache_lock:
+        return analysis_cache.get(key)
+
+def cache_set(key: str, payload: bytes) -> None:
+    """Store a serialized response with the standard TTL."""
+    if redis_client is not None:
+        try:
+            redis_client.setex(key, CACHE_TTL, payload)
+            return
+        except redis.RedisError:
+            pass
+    with cache_lock:
+        analysis_cache[key] = payload
+
+# In-flight request coalescing: if two clients POST identical code
+# before the first analysis lands in the cache, the second should wait
+# for the first instead of paying for a duplicate LLM call. Futures are
+# concurrent.futures.Future, not asyncio.Future, because each Flask
+# async view runs on its own event loop.
+_inflight: Dict[str, concurrent.futures.Future] = {}
+_inflight_lock = threading.Lock()
+
+def _purge_expired_cache_entries():
+    """Actively sweep expired cache entries every minute.
+
+    TTLCache only evicts lazily on access, so entries for code that is
+    never re-requested would otherwise sit in memory for the life of the
+    process; the sweep keeps RSS proportional to recent traffic.
+    """
+    while True:
+        time.sleep(60)
+        with cache_lock:
+            analysis_cache.expire()
+            ast_cache.expire()
+
+threading.Thread(target=_purge_expired_cache_entries,
+                 daemon=True, name="cache-purge").start()
+
+class _LLMThrottle:
+    """Proactive token bucket in front of outbound LLM calls.
+
+    Flask-Limiter shields our endpoints, but nothing paced the calls we
+    make to the provider, so bursty traffic ran straight into provider
+    429s and burned wall-clock in retries. Spacing calls to LLM_RPM up
+    front avoids those wasted round-trips. The bucket hands out start
+    slots under a thread lock rather than using asyncio primitives
+    because each Flask async view runs on its own event loop.
+    """
+
+    def __init__(self, rpm: int) -> None:
+        self._interval = 60.0 / rpm
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def _claim_slot(self) -> float:
+        """Reserve the next start slot, returning how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self._interval
+        return slot - now
+
+    async def acquire(self) -> None:
+        delay = self._claim_slot()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self) -> None:
+        """Same pacing for sync callers such as the SSE view"""
+        delay = self._claim_slot()
+        if delay > 0:
+            time.sleep(delay)
+
+llm_throttle = _LLMThrottle(int(os.environ.get("LLM_RPM", 60)))
 
 class CodeReviewService:
     """Orchestrates the code review pipeline"""
     
     def __init__(self):
-        # Initialize analyzers
+        # Availability marker for /health; actual analyses run on fresh
+        # per-task instances via _analyze_ast
         self.ast_analyzer = ASTAnalyzer()
         self.llm_reviewer = None
-        
+        self._merger = None
+        # Dedicated pool for AST work. asyncio.to_thread shares the
+        # loop's default executor with every other blocking call, so
+        # AST jobs could queue behind unrelated tasks; a named pool
+        # sized to the CPU count keeps their latency stable.
+        self._ast_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=os.cpu_count(), thread_name_prefix="ast"
+        )
+
         # Check for LLM API key in environment
         api_key = os.environ.get("LLM_API_KEY")
         provider = os.environ.get("LLM_PROVIDER", "anthropic")
-        
+
         if api_key:
+            from analyzers.llm_integration import (
+                LLMCodeReviewer, LLMProvider, ResultMerger
+            )
+            self._merger = ResultMerger
             if provider == "anthropic":
                 provider_enum = LLMProvider.ANTHROPIC
             elif provider == "openai":
@@ -53,38 +205,80 @@ class CodeReviewService:
                 print(f"⚠ Failed to initialize LLM reviewer: {e}")
         else:
             print("⚠ No LLM_API_KEY found. Running in AST-only mode.")
-    
-    def analyze_code(self, code: str, use_llm: bool = True, 
-                    focus_areas: List[str] = None) -> Dict[str, Any]:
+
+    @staticmethod
+    def _ast_to_dicts(issues: List[CodeIssue]) -> List[Dict[str, Any]]:
+        """Convert analyzer issues to response dicts tagged with their source."""
+        return [issue.to_dict(source='ast') for issue in issues]
+
+    @staticmethod
+    def _analyze_ast(code: str) -> List[CodeIssue]:
+        """Run static analysis on a fresh analyzer instance.
+
+        Analyzer instances hold per-run state, so sharing one across
+        pool threads and concurrent requests would race; each task gets
+        its own, and the analyzer's content-addressed module cache
+        still deduplicates repeat work.
+        """
+        return ASTAnalyzer().analyze(code)
+
+    async def analyze_code(self, code: str, use_llm: bool = True,
+                           focus_areas: List[str] = None,
+                           code_hash: str = None) -> Dict[str, Any]:
         """
         Complete code analysis pipeline
-        
+
         Args:
             code: Source code to analyze
             use_llm: Whether to use LLM for advanced analysis
             focus_areas: Specific areas to focus on
-        
+            code_hash: Precomputed content hash, enables the AST cache
+
         Returns:
             Dictionary with analysis results
         """
         start_time = time.time()
-        
-        # Step 1: Static AST analysis
-        ast_issues = []
-        try:
-            ast_issues_obj = self.ast_analyzer.analyze(code)
-            ast_issues = [issue.to_dict() for issue in ast_issues_obj]
-            for issue in ast_issues:
-                issue['source'] = 'ast'
-        except Exception as e:
-            print(f"AST analysis error: {e}")
-        
-        # Step 2: LLM analysis (if enabled and available)
+
+        # Step 1: Static AST analysis starts in a worker thread, off the
+        # event loop so other requests keep making progress. Cached
+        # issues are copied because the merge step mutates matched dicts.
+        ast_issues = None
+        if code_hash is not None:
+            with cache_lock:
+                cached_ast = ast_cache.get(code_hash)
+            if cached_ast is not None:
+                ast_issues = [dict(issue) for issue in cached_ast]
+        ast_task = None
+        if ast_issues is None:
+            ast_task = asyncio.get_running_loop().run_in_executor(
+                self._ast_pool, self._analyze_ast, code
+            )
+
+        # Step 2: LLM analysis (if enabled and available). The LLM call
+        # is the long pole, so it never waits for AST to finish: AST
+        # gets a short head start so its issues can ride along as prompt
+        # context, then the LLM launches with whatever is ready and the
+        # merge picks up the full AST result afterwards.
         llm_issues = []
         if use_llm and self.llm_reviewer:
+            prompt_ast = ast_issues
+            if prompt_ast is None:
+                try:
+                    prompt_ast = self._ast_to_dicts(
+                        await asyncio.wait_for(asyncio.shield(ast_task), 0.05)
+                    )
+                    ast_issues = prompt_ast
+                except asyncio.TimeoutError:
+                    prompt_ast = []  # still parsing; LLM goes without context
+                except Exception as e:
+                    print(f"AST analysis error: {e}")
+                    ast_issues = []
+                    prompt_ast = []
+                    ast_task = None
             try:
-                llm_issues_obj = self.llm_reviewer.review_code(
-                    code, ast_issues, focus_areas
+                await llm_throttle.acquire()
+                llm_issues_obj = await self.llm_reviewer.review_code_async(
+                    code, prompt_ast, focus_areas
                 )
                 llm_issues = [
                     {
@@ -101,10 +295,22 @@ class CodeReviewService:
                 ]
             except Exception as e:
                 print(f"LLM analysis failed: {str(e)}")
-        
+
+        # Collect the full AST result (instant if it finished above)
+        if ast_issues is None:
+            try:
+                ast_issues = self._ast_to_dicts(await ast_task)
+            except Exception as e:
+                print(f"AST analysis error: {e}")
+                ast_issues = []
+                ast_task = None
+        if ast_task is not None and code_hash is not None:
+            with cache_lock:
+                ast_cache[code_hash] = [dict(issue) for issue in ast_issues]
+
         # Step 3: Merge results
         if ast_issues and llm_issues:
-            all_issues = ResultMerger.merge_results(ast_issues, llm_issues)
+            all_issues = self._merger.merge_results(ast_issues, llm_issues)
         else:
             all_issues = ast_issues + llm_issues
         
@@ -117,28 +323,92 @@ class CodeReviewService:
             "analysis_time": round(time.time() - start_time, 2),
             "summary": summary,
             "issues": all_issues,
-            "code_lines": len(code.split('\n')),
+            # count('\n') scans in C without allocating the line list
+            "code_lines": code.count('\n') + (0 if code.endswith('\n') else 1),
             "llm_used": use_llm and self.llm_reviewer is not None
         }
         
         return result
     
+    async def analyze_code_batch_api(self, snippets: List[Dict[str, Any]],
+                                     focus_areas: List[str] = None) -> List[Dict[str, Any]]:
+        """Analyze a batch through the provider's server-side batch API.
+
+        AST analysis for every snippet runs locally (in threads) to build
+        the prompt context, then all prompts go up as one batch job at
+        half the per-token cost. Results mirror the per-snippet shape of
+        the gather path.
+        """
+        start_time = time.time()
+        codes = [s.get('code', '') for s in snippets]
+
+        loop = asyncio.get_running_loop()
+        ast_lists = await asyncio.gather(
+            *(loop.run_in_executor(self._ast_pool, self._analyze_ast, code)
+              for code in codes)
+        )
+        ast_dicts = [self._ast_to_dicts(issues) for issues in ast_lists]
+
+        await llm_throttle.acquire()  # one batch job is one provider call
+        llm_lists = await self.llm_reviewer.review_batch(codes, ast_dicts, focus_areas)
+
+        results = []
+        for snippet, code, ast_issues, llm_issues_obj in zip(snippets, codes, ast_dicts, llm_lists):
+            # Failed batch entries come back as exceptions; report them
+            # like the gather path does rather than passing off an
+            # AST-only result as a clean review
+            if isinstance(llm_issues_obj, Exception):
+                results.append({
+                    "id": snippet.get('id', 'unknown'),
+                    "success": False,
+                    "error": str(llm_issues_obj)
+                })
+                continue
+            llm_issues = [
+                {
+                    "line": issue.line,
+                    "column": 0,
+                    "severity": issue.severity,
+                    "category": issue.category,
+                    "message": issue.message,
+                    "suggestion": issue.suggestion,
+                    "reasoning": issue.reasoning,
+                    "source": "llm"
+                }
+                for issue in llm_issues_obj
+            ]
+            if ast_issues and llm_issues:
+                all_issues = self._merger.merge_results(ast_issues, llm_issues)
+            else:
+                all_issues = ast_issues + llm_issues
+            results.append({
+                "id": snippet.get('id', 'unknown'),
+                "success": True,
+                "data": {
+                    "success": True,
+                    "analysis_time": round(time.time() - start_time, 2),
+                    "summary": self._generate_summary(all_issues),
+                    "issues": all_issues,
+                    "code_lines": code.count('\n') + (0 if code.endswith('\n') else 1),
+                    "llm_used": True
+                }
+            })
+        return results
+
     def _generate_summary(self, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate summary statistics from issues"""
-        summary = {
+        """Generate summary statistics from issues in a single pass"""
+        severities = Counter()
+        categories = Counter()
+        for issue in issues:
+            severities[issue.get("severity", "info")] += 1
+            categories[issue.get("category", "general")] += 1
+        return {
             "total_issues": len(issues),
-            "errors": sum(1 for i in issues if i["severity"] == "error"),
-            "warnings": sum(1 for i in issues if i["severity"] == "warning"),
-            "info": sum(1 for i in issues if i["severity"] == "info"),
-            "categories": {}
+            "errors": severities["error"],
+            "warnings": severities["warning"],
+            "info": severities["info"],
+            "categories": dict(categories)
         }
-        
-        # Count by category
-        for issue in issues:
-            category = issue.get("category", "general")
-            summary["categories"][category] = summary["categories"].get(category, 0) + 1
-        
-        return summary
 
 # Initialize service
 review_service = CodeReviewService()
@@ -146,7 +416,7 @@ review_service = CodeReviewService()
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return ojson({
         "status": "healthy",
         "llm_available": review_service.llm_reviewer is not None,
         "ast_available": review_service.ast_analyzer is not None
@@ -154,7 +424,7 @@ def health_check():
 
 @app.route('/api/analyze', methods=['POST'])
 @limiter.limit("20 per minute")
-def analyze_code():
+async def analyze_code():
     """
     Main endpoint for code analysis
     
@@ -170,58 +440,204 @@ def analyze_code():
         
         # Validate request
         if not data or 'code' not in data:
-            return jsonify({
+            return ojson({
                 "success": False,
                 "error": "Missing 'code' in request body"
-            }), 400
+            }, 400)
         
         code = data['code']
         use_llm = data.get('use_llm', True)
         focus_areas = data.get('focus_areas', None)
         
-        # Validate code length
-        if len(code) > 50000:  # 50KB limit
-            return jsonify({
+        # Validate and hash in a single pass: the byte copy the hasher
+        # needs anyway doubles as the length and emptiness check, so the
+        # (up to 50KB) string is encoded once instead of walked three
+        # times. xxh3 is SIMD-vectorized and several times faster than
+        # MD5 on payloads this size.
+        code_bytes = code.encode('utf-8', 'ignore')
+        if len(code_bytes) > 50000:  # 50KB limit
+            return ojson({
                 "success": False,
                 "error": "Code exceeds maximum length of 50,000 characters"
-            }), 400
-        
-        if not code.strip():
-            return jsonify({
+            }, 400)
+
+        if not code_bytes.strip():
+            return ojson({
                 "success": False,
                 "error": "Code cannot be empty"
-            }), 400
-        
-        # Check cache
-        cache_key = hashlib.md5(
-            f"{code}:{use_llm}:{focus_areas}".encode()
-        ).hexdigest()
-        
-        if cache_key in analysis_cache:
-            cached_result, timestamp = analysis_cache[cache_key]
-            if time.time() - timestamp < CACHE_TTL:
-                cached_result['from_cache'] = True
-                return jsonify(cached_result)
-        
+            }, 400)
+
+        hasher = xxhash.xxh3_128(code_bytes)
+        code_hash = hasher.hexdigest()
+        # Request parameters are folded into the same hasher rather than
+        # concatenated into a key string. focus_areas is canonicalized
+        # by sorting so ["perf", "security"] and ["security", "perf"]
+        # share an entry, and MODEL_VERSION is mixed in so a model bump
+        # never serves results produced by the previous model.
+        fa_key = tuple(sorted(focus_areas)) if focus_areas else ()
+        hasher.update(f":{use_llm}:{fa_key}:{_MODEL_VERSION}".encode())
+        cache_key = hasher.hexdigest()
+
+        # Cached entries are pre-serialized bytes with from_cache baked
+        # in, so a hit is a Response wrap with no re-serialization
+        cached_payload = cache_get(cache_key)
+        if cached_payload is not None:
+            return app.response_class(cached_payload,
+                                      mimetype="application/json")
+
+        # Coalesce with any identical request already running
+        with _inflight_lock:
+            fut = _inflight.get(cache_key)
+            if fut is None:
+                fut = concurrent.futures.Future()
+                _inflight[cache_key] = fut
+                is_owner = True
+            else:
+                is_owner = False
+
+        if not is_owner:
+            # fut.result blocks, so wait in a thread off the event loop
+            result = dict(await asyncio.to_thread(fut.result))
+            result['from_cache'] = True
+            return ojson(result)
+
         # Perform analysis
-        result = review_service.analyze_code(code, use_llm, focus_areas)
-        
-        # Cache result
-        analysis_cache[cache_key] = (result, time.time())
+        try:
+            result = await review_service.analyze_code(
+                code, use_llm, focus_areas, code_hash=code_hash
+            )
+            fut.set_result(result)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(cache_key, None)
+
+        # Cache the serialized form, skipping failed results and
+        # oversized payloads so bad or bloated entries never pin memory
+        result['from_cache'] = True
+        payload = orjson.dumps(result)
+        if result.get("success") and len(payload) <= MAX_CACHED_BYTES:
+            cache_set(cache_key, payload)
         result['from_cache'] = False
-        
-        return jsonify(result)
+
+        return ojson(result)
     
     except Exception as e:
         print(f"Analysis error: {e}")
-        return jsonify({
+        return ojson({
             "success": False,
             "error": f"Analysis failed: {str(e)}"
-        }), 500
+        }, 500)
+
+@app.route('/api/analyze/stream', methods=['POST'])
+@limiter.limit("20 per minute")
+def analyze_stream():
+    """
+    Streaming analysis endpoint (Server-Sent Events)
+
+    Same body as /api/analyze, but issues arrive as they are found:
+    AST issues within tens of milliseconds, LLM issues once the review
+    completes, and a final "summary" event. Perceived latency drops to
+    AST latency instead of the full LLM round-trip, and the frontend
+    can render progressively.
+    """
+    data = request.get_json()
+
+    if not data or 'code' not in data:
+        return ojson({
+            "success": False,
+            "error": "Missing 'code' in request body"
+        }, 400)
+
+    code = data['code']
+    use_llm = data.get('use_llm', True)
+    focus_areas = data.get('focus_areas', None)
+
+    code_bytes = code.encode('utf-8', 'ignore')
+    if len(code_bytes) > 50000:  # 50KB limit
+        return ojson({
+            "success": False,
+            "error": "Code exceeds maximum length of 50,000 characters"
+        }, 400)
+
+    if not code_bytes.strip():
+        return ojson({
+            "success": False,
+            "error": "Code cannot be empty"
+        }, 400)
+
+    def _event(name: str, obj: Any) -> str:
+        return f"event: {name}\ndata: {orjson.dumps(obj).decode()}\n\n"
+
+    def generate():
+        start_time = time.time()
+
+        ast_issues = []
+        try:
+            ast_issues = review_service._ast_to_dicts(
+                review_service._analyze_ast(code)
+            )
+        except Exception as e:
+            print(f"AST analysis error: {e}")
+        for issue in ast_issues:
+            yield _event("issue", issue)
+
+        llm_issues = []
+        if use_llm and review_service.llm_reviewer:
+            try:
+                # The provider streams tokens, but issues are only
+                # parseable from the completed JSON document, so they
+                # are emitted in one flush after parsing rather than
+                # forwarded one-by-one mid-response
+                llm_throttle.acquire_sync()
+                llm_issues_obj = review_service.llm_reviewer.review_code(
+                    code, ast_issues, focus_areas
+                )
+                llm_issues = [
+                    {
+                        "line": issue.line,
+                        "column": 0,
+                        "severity": issue.severity,
+                        "category": issue.category,
+                        "message": issue.message,
+                        "suggestion": issue.suggestion,
+                        "reasoning": issue.reasoning,
+                        "source": "llm"
+                    }
+                    for issue in llm_issues_obj
+                ]
+            except Exception as e:
+                print(f"LLM analysis failed: {str(e)}")
+
+        # Merge so LLM duplicates of already-sent AST issues are
+        # dropped; only the surviving LLM issues still need emitting
+        if ast_issues and llm_issues:
+            all_issues = review_service._merger.merge_results(ast_issues, llm_issues)
+        else:
+            all_issues = ast_issues + llm_issues
+        for issue in all_issues:
+            if issue.get('source') == 'llm':
+                yield _event("issue", issue)
+
+        yield _event("summary", {
+            "success": True,
+            "analysis_time": round(time.time() - start_time, 2),
+            "summary": review_service._generate_summary(all_issues),
+            "code_lines": code.count('\n') + (0 if code.endswith('\n') else 1),
+            "llm_used": use_llm and review_service.llm_reviewer is not None
+        })
+
+    return app.response_class(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route('/api/analyze/batch', methods=['POST'])
 @limiter.limit("5 per minute")
-def analyze_batch():
+async def analyze_batch():
     """
     Batch analysis endpoint for multiple code snippets
     
@@ -238,89 +654,117 @@ def analyze_batch():
         data = request.get_json()
         
         if not data or 'snippets' not in data:
-            return jsonify({
+            return ojson({
                 "success": False,
                 "error": "Missing 'snippets' in request body"
-            }), 400
+            }, 400)
         
         snippets = data['snippets']
         use_llm = data.get('use_llm', True)
         
         if len(snippets) > 10:
-            return jsonify({
+            return ojson({
                 "success": False,
                 "error": "Maximum 10 snippets per batch request"
-            }), 400
+            }, 400)
         
+        # Provider batch API: one submission for all snippets at half
+        # the per-token cost, scheduled server-side
+        use_batch_api = data.get('use_batch_api', False)
+        if (use_batch_api and use_llm and review_service.llm_reviewer
+                and review_service.llm_reviewer.supports_batch()):
+            results = await review_service.analyze_code_batch_api(snippets)
+            return ojson({
+                "success": True,
+                "results": results
+            })
+
+        # Analyze snippets concurrently: wall-clock approaches the
+        # slowest single snippet instead of the sum. The semaphore caps
+        # in-flight LLM calls; it is created here because each async
+        # view runs on its own event loop.
+        semaphore = asyncio.Semaphore(int(os.environ.get("LLM_MAX_CONCURRENCY", 8)))
+
+        async def _analyze_snippet(snippet):
+            async with semaphore:
+                result = await review_service.analyze_code(snippet.get('code', ''), use_llm)
+            return {
+                "id": snippet.get('id', 'unknown'),
+                "success": True,
+                "data": result
+            }
+
+        gathered = await asyncio.gather(
+            *(_analyze_snippet(s) for s in snippets),
+            return_exceptions=True
+        )
+
         results = []
-        for snippet in snippets:
-            snippet_id = snippet.get('id', 'unknown')
-            code = snippet.get('code', '')
-            
-            try:
-                result = review_service.analyze_code(code, use_llm)
+        for snippet, outcome in zip(snippets, gathered):
+            if isinstance(outcome, Exception):
                 results.append({
-                    "id": snippet_id,
-                    "success": True,
-                    "data": result
-                })
-            except Exception as e:
-                results.append({
-                    "id": snippet_id,
+                    "id": snippet.get('id', 'unknown'),
                     "success": False,
-                    "error": str(e)
+                    "error": str(outcome)
                 })
-        
-        return jsonify({
+            else:
+                results.append(outcome)
+
+        return ojson({
             "success": True,
             "results": results
         })
     
     except Exception as e:
-        return jsonify({
+        return ojson({
             "success": False,
             "error": f"Batch analysis failed: {str(e)}"
-        }), 500
+        }, 500)
+
+# The category list is static, so it is serialized once at import time;
+# the route only wraps the ready-made bytes (a fresh Response per
+# request, since Response objects are not safely reusable)
+_CATEGORIES_JSON = orjson.dumps({
+    "categories": [
+        {"id": "syntax", "name": "Syntax Errors", "color": "#dc2626"},
+        {"id": "logic", "name": "Logic Errors", "color": "#ea580c"},
+        {"id": "security", "name": "Security", "color": "#c026d3"},
+        {"id": "performance", "name": "Performance", "color": "#2563eb"},
+        {"id": "style", "name": "Code Style", "color": "#059669"},
+        {"id": "best_practice", "name": "Best Practices", "color": "#0891b2"},
+        {"id": "edge_case", "name": "Edge Cases", "color": "#7c3aed"},
+        {"id": "unused", "name": "Unused Code", "color": "#64748b"}
+    ]
+})
 
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """Get available issue categories"""
-    return jsonify({
-        "categories": [
-            {"id": "syntax", "name": "Syntax Errors", "color": "#dc2626"},
-            {"id": "logic", "name": "Logic Errors", "color": "#ea580c"},
-            {"id": "security", "name": "Security", "color": "#c026d3"},
-            {"id": "performance", "name": "Performance", "color": "#2563eb"},
-            {"id": "style", "name": "Code Style", "color": "#059669"},
-            {"id": "best_practice", "name": "Best Practices", "color": "#0891b2"},
-            {"id": "edge_case", "name": "Edge Cases", "color": "#7c3aed"},
-            {"id": "unused", "name": "Unused Code", "color": "#64748b"}
-        ]
-    })
+    return app.response_class(_CATEGORIES_JSON, mimetype="application/json")
 
 @app.errorhandler(429)
 def ratelimit_handler(e):
     """Rate limit error handler"""
-    return jsonify({
+    return ojson({
         "success": False,
         "error": "Rate limit exceeded. Please try again later."
-    }), 429
+    }, 429)
 
 @app.errorhandler(404)
 def not_found(e):
     """404 handler"""
-    return jsonify({
+    return ojson({
         "success": False,
         "error": "Endpoint not found"
-    }), 404
+    }, 404)
 
 @app.errorhandler(500)
 def server_error(e):
     """500 handler"""
-    return jsonify({
+    return ojson({
         "success": False,
         "error": "Internal server error"
-    }), 500
+    }, 500)
 
 if __name__ == '__main__':
     print("=" * 50)
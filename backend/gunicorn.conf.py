@@ -0,0 +1,26 @@
+"""Gunicorn configuration for the code review backend.
+
+Run with:  gunicorn app:app
+
+The dev server (`python app.py`) handles one request at a time, so a
+single slow LLM call blocks everything including /health. Threaded
+workers let each process keep many I/O-bound requests in flight while
+one waits on the provider.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# CPU-bound AST work scales with processes, LLM-bound waits with threads
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_class = "gthread"
+
+# LLM calls can legitimately take a while; don't kill workers mid-review
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"